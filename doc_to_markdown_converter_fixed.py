@@ -26,18 +26,20 @@ Date: September 17, 2025
 import os
 import sys
 import argparse
+import functools
 import re
 import logging
 from pathlib import Path
 from typing import List, Dict, Optional, Union
 import tempfile
 import shutil
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from datetime import datetime
 import quopri  # For proper quoted-printable decoding
 
 # Third-party imports (install with: pip install beautifulsoup4 html2text python-docx markdownify)
 try:
-    from bs4 import BeautifulSoup, Comment
+    from bs4 import BeautifulSoup, Comment, Tag
     import html2text
     from docx import Document
     import markdownify
@@ -58,6 +60,69 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Precompiled patterns for the markdown post-processing loop; re caches
+# compiled patterns but still pays a lookup per call
+_HEADER_SPACE_RE = re.compile(r'^(#+)([^\s])')
+_ORDERED_LIST_RE = re.compile(r'^(\d+)\.\s*(.*)')
+_WS_RE = re.compile(r'\s+')
+_MULTINL_RE = re.compile(r'\n{3,}')
+
+# Tag/attribute sets used by the single-pass HTML cleanup
+_UNWANTED_TAGS = frozenset(('script', 'style', 'meta', 'link', 'head'))
+_ATTRS_TO_KEEP = frozenset(('href', 'src', 'alt', 'title', 'id'))
+_BLOCK_TAGS = ['div', 'p', 'ul', 'ol', 'table', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6']
+
+# Prefer lxml's C parser for BeautifulSoup when available (it is already in
+# requirements.txt); fall back to the pure-Python stdlib parser otherwise
+try:
+    import lxml  # noqa: F401
+    _SOUP_PARSER = 'lxml'
+except ImportError:
+    _SOUP_PARSER = 'html.parser'
+
+# Common quoted-printable sequences decoded without invoking quopri
+_QP_REPLACEMENTS = [
+    ('=3D', '='),
+    ('=20', ' '),
+    ('=E2=80=99', "'"),  # Right single quotation mark
+    ('=E2=80=93', "–"),  # En dash
+    ('=E2=80=94', "—"),  # Em dash
+    ('=E2=80=9C', '"'),  # Left double quotation mark
+    ('=E2=80=9D', '"'),  # Right double quotation mark
+    ('=C2=A0', ' '),     # Non-breaking space
+]
+
+
+@functools.lru_cache(maxsize=4096)
+def _decode_quoted_printable_line(line: str) -> tuple[str, bool]:
+    """
+    Decode a single line of quoted-printable content.
+    Returns tuple of (decoded_line, has_soft_break)
+
+    MHTML exports repeat many identical lines (blank lines, boundary
+    padding, boilerplate markup), so logically-equal inputs are memoized.
+    """
+    # Check if line ends with a soft line break (= at end)
+    has_soft_break = line.rstrip().endswith('=')
+
+    if has_soft_break:
+        # Remove the trailing = and any whitespace
+        line = line.rstrip('=').rstrip()
+
+    for old, new in _QP_REPLACEMENTS:
+        line = line.replace(old, new)
+
+    # Handle other hex-encoded characters using quopri
+    try:
+        # Only decode if there are still =XX sequences
+        if '=' in line and re.search(r'=[0-9A-Fa-f]{2}', line):
+            line = quopri.decodestring(line.encode()).decode('utf-8', errors='ignore')
+    except Exception:
+        # If decoding fails, keep the original line
+        pass
+
+    return line, has_soft_break
+
 
 class DocToMarkdownConverter:
     """Main converter class for handling various document formats."""
@@ -92,34 +157,30 @@ class DocToMarkdownConverter:
         try:
             with open(file_path, 'rb') as f:
                 header = f.read(4096)  # Read more data for better detection
-                
-            # Decode as text for content analysis
-            try:
-                header_text = header.decode('utf-8', errors='ignore')
-            except:
-                header_text = header.decode('latin1', errors='ignore')
-            
+
+            # Lowercase once; every substring probe below reuses this buffer
+            # instead of allocating its own copy of the header
+            lowered = header.lower()
+
             # Check for MHTML/MIME content first (highest priority for Confluence exports)
-            if (b'MIME-Version:' in header and b'text/html' in header) or \
-               ('MIME-Version:' in header_text and 'text/html' in header_text):
+            if b'MIME-Version:' in header and b'text/html' in header:
                 logger.info(f"Detected MHTML content in {file_path} (extension: {extension})")
                 return 'mhtml'
-            
+
             # Check for HTML content
-            if (b'<html' in header.lower() or b'<!doctype html' in header.lower()) or \
-               ('<html' in header_text.lower() or '<!doctype html' in header_text.lower()):
+            if b'<html' in lowered or b'<!doctype html' in lowered:
                 logger.info(f"Detected HTML content in {file_path}")
                 return 'html'
-            
+
             # Check for Confluence export markers (even in .doc files)
             confluence_markers = [
-                'Exported From Confluence',
-                'confluence.com',
-                'Content-Type: multipart/related',
-                'boundary="----=_Part_'
+                b'Exported From Confluence',
+                b'confluence.com',
+                b'Content-Type: multipart/related',
+                b'boundary="----=_Part_'
             ]
-            
-            if any(marker in header_text for marker in confluence_markers):
+
+            if any(marker in header for marker in confluence_markers):
                 logger.info(f"Detected Confluence export content in {file_path} (extension: {extension})")
                 return 'mhtml'
             
@@ -163,38 +224,7 @@ class DocToMarkdownConverter:
         Decode a single line of quoted-printable content.
         Returns tuple of (decoded_line, has_soft_break)
         """
-        # Check if line ends with a soft line break (= at end)
-        has_soft_break = line.rstrip().endswith('=')
-        
-        if has_soft_break:
-            # Remove the trailing = and any whitespace
-            line = line.rstrip('=').rstrip()
-        
-        # Decode common quoted-printable sequences
-        replacements = [
-            ('=3D', '='),
-            ('=20', ' '),
-            ('=E2=80=99', "'"),  # Right single quotation mark
-            ('=E2=80=93', "–"),  # En dash
-            ('=E2=80=94', "—"),  # Em dash
-            ('=E2=80=9C', '"'),  # Left double quotation mark
-            ('=E2=80=9D', '"'),  # Right double quotation mark
-            ('=C2=A0', ' '),     # Non-breaking space
-        ]
-        
-        for old, new in replacements:
-            line = line.replace(old, new)
-        
-        # Handle other hex-encoded characters using quopri
-        try:
-            # Only decode if there are still =XX sequences
-            if '=' in line and re.search(r'=[0-9A-Fa-f]{2}', line):
-                line = quopri.decodestring(line.encode()).decode('utf-8', errors='ignore')
-        except Exception:
-            # If decoding fails, keep the original line
-            pass
-        
-        return line, has_soft_break
+        return _decode_quoted_printable_line(line)
     
     def extract_mhtml_content(self, file_path: Union[str, Path]) -> str:
         """Extract HTML content from MHTML/MIME files like Confluence exports."""
@@ -214,47 +244,57 @@ class DocToMarkdownConverter:
             if content is None:
                 raise ValueError("Could not decode file with any supported encoding")
         
-            # Find the HTML part in the MIME message
-            lines = content.split('\n')
-            html_start = False
+            # Locate the HTML part with C-level substring searches (str.find
+            # uses memmem under the hood) instead of splitting the whole
+            # file into lines just to scan for the boundary
+            marker = 'Content-Type: text/html'
+            start = content.find(marker)
+            if start < 0:
+                start = content.lower().find(marker.lower())
+
             html_lines = []
-            
-            for line in lines:
-                # Look for HTML content type
-                if 'Content-Type: text/html' in line or 'content-type: text/html' in line.lower():
-                    html_start = True
-                    continue
-                # Look for MIME boundary end
-                elif html_start and (line.startswith('------=_Part_') or line.startswith('--==')):
-                    break  # End of HTML section
-                elif html_start and line.strip():
-                    html_lines.append(line)
+            if start >= 0:
+                body_start = content.find('\n', start) + 1
+                if body_start > 0 and not content.startswith(('------=_Part_', '--=='), body_start):
+                    end = len(content)
+                    for boundary in ('\n------=_Part_', '\n--=='):
+                        pos = content.find(boundary, body_start)
+                        if 0 <= pos < end:
+                            end = pos
+                    # Only the HTML slice gets split; blank lines are
+                    # dropped below as before
+                    html_lines = [line for line in content[body_start:end].split('\n') if line.strip()]
             
             # If no HTML section was found, try to extract HTML directly
             if not html_lines and ('<html' in content.lower() or '<body' in content.lower()):
                 logger.info("No MIME sections found, treating entire content as HTML")
                 return content
             
-            # Process HTML lines with proper quoted-printable decoding
+            # Process HTML lines with proper quoted-printable decoding.
+            # Soft-broken fragments collect in a list and join once, instead
+            # of growing a string by repeated concatenation (O(n^2))
             decoded_lines = []
-            accumulated_line = ""
-            
+            pending_parts = []
+
             for line in html_lines:
                 decoded_line, has_soft_break = self.decode_quoted_printable_line(line)
-                
+
                 if has_soft_break:
-                    # Accumulate this line for joining with the next
-                    accumulated_line += decoded_line
+                    # Accumulate this fragment for joining with the next
+                    pending_parts.append(decoded_line)
                 else:
-                    # Complete line - add any accumulated content and append
-                    complete_line = accumulated_line + decoded_line
+                    # Complete line - join any accumulated fragments and append
+                    pending_parts.append(decoded_line)
+                    complete_line = ''.join(pending_parts)
+                    pending_parts.clear()
                     if complete_line.strip():  # Only add non-empty lines
                         decoded_lines.append(complete_line)
-                    accumulated_line = ""
-            
-            # Don't forget any remaining accumulated line
-            if accumulated_line.strip():
-                decoded_lines.append(accumulated_line)
+
+            # Don't forget any remaining accumulated fragments
+            if pending_parts:
+                remaining = ''.join(pending_parts)
+                if remaining.strip():
+                    decoded_lines.append(remaining)
             
             result = '\n'.join(decoded_lines)
             logger.info(f"Extracted and decoded {len(result)} characters of HTML content from MHTML")
@@ -272,40 +312,46 @@ class DocToMarkdownConverter:
     
     def clean_html_content(self, html_content: str) -> str:
         """Clean and prepare HTML content for markdown conversion."""
-        soup = BeautifulSoup(html_content, 'html.parser')
-        
-        # Remove unwanted elements
-        unwanted_tags = ['script', 'style', 'meta', 'link', 'head']
-        for tag in unwanted_tags:
-            for element in soup.find_all(tag):
-                element.decompose()
-        
-        # Remove comments
-        for comment in soup.find_all(string=lambda text: isinstance(text, Comment)):
-            comment.extract()
-        
-        # Remove or clean attributes that cause formatting issues
-        for tag in soup.find_all():
-            # Keep only essential attributes
-            attrs_to_keep = ['href', 'src', 'alt', 'title', 'id']
-            if tag.name in ['a', 'img']:
-                new_attrs = {k: v for k, v in tag.attrs.items() if k in attrs_to_keep}
-                tag.attrs = new_attrs
-            else:
-                tag.attrs = {}
-        
-        # Fix common Confluence/Word export issues
-        # Remove empty paragraphs
-        for p in soup.find_all('p'):
-            if not p.get_text(strip=True):
-                p.decompose()
-        
-        # Convert divs to paragraphs where appropriate
-        for div in soup.find_all('div'):
-            if not div.find_all(['div', 'p', 'ul', 'ol', 'table', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6']):
-                div.name = 'p'
-        
+        soup = BeautifulSoup(html_content, _SOUP_PARSER)
+
+        # One post-order walk replaces the previous find_all passes (tag
+        # removal, comment removal, attribute wipe, empty-<p> pruning and
+        # <div>-to-<p> conversion each rewalked the whole tree)
+        self._clean_node(soup)
+
         return str(soup)
+
+    def _clean_node(self, node) -> None:
+        """Recursively clean a single node of the parsed tree."""
+        for child in list(node.children):
+            # Remove comments
+            if isinstance(child, Comment):
+                child.extract()
+                continue
+            if not isinstance(child, Tag):
+                continue
+            # Remove unwanted elements
+            if child.name in _UNWANTED_TAGS:
+                child.decompose()
+                continue
+
+            self._clean_node(child)
+
+            # Keep only essential attributes on links/images; wipe the rest
+            if child.attrs:
+                if child.name in ('a', 'img'):
+                    child.attrs = {k: v for k, v in child.attrs.items() if k in _ATTRS_TO_KEEP}
+                else:
+                    child.attrs = {}
+
+            # Fix common Confluence/Word export issues: drop empty
+            # paragraphs and turn leaf divs into paragraphs
+            if child.name == 'p':
+                if not child.get_text(strip=True):
+                    child.decompose()
+            elif child.name == 'div':
+                if not child.find(_BLOCK_TAGS):
+                    child.name = 'p'
     
     def convert_docx_to_markdown(self, file_path: Union[str, Path]) -> str:
         """Convert DOCX files to markdown using mammoth."""
@@ -417,27 +463,27 @@ class DocToMarkdownConverter:
             # Normalize headers
             if line.startswith('#'):
                 # Ensure space after hash
-                line = re.sub(r'^(#+)([^\s])', r'\1 \2', line)
+                line = _HEADER_SPACE_RE.sub(r'\1 \2', line)
                 # Limit header depth to 6 levels
                 if line.startswith('#######'):
                     line = '######' + line[7:]
-            
+
             # Clean up list items
             if line.startswith(('- ', '* ', '+ ')):
                 line = '- ' + line[2:].strip()
-            elif re.match(r'^\d+\.', line):
-                match = re.match(r'^(\d+)\.\s*(.*)', line)
+            else:
+                match = _ORDERED_LIST_RE.match(line)
                 if match:
                     line = f"{match.group(1)}. {match.group(2).strip()}"
-            
+
             # Remove excessive whitespace
-            line = re.sub(r'\s+', ' ', line).strip()
-            
+            line = _WS_RE.sub(' ', line).strip()
+
             processed_lines.append(line)
-        
+
         # Join lines and clean up excessive newlines
         result = '\n'.join(processed_lines)
-        result = re.sub(r'\n{3,}', '\n\n', result)  # Max 2 consecutive newlines
+        result = _MULTINL_RE.sub('\n\n', result)  # Max 2 consecutive newlines
         
         return result.strip()
     
@@ -526,41 +572,69 @@ format: "markdown"
             logger.error(f"Failed to convert {input_path}: {e}")
             raise
     
-    def batch_convert(self, input_dir: Union[str, Path], 
+    def batch_convert(self, input_dir: Union[str, Path],
                      output_dir: Optional[Union[str, Path]] = None,
-                     pattern: str = "*.*") -> List[str]:
-        """Convert multiple files in a directory."""
+                     pattern: str = "*.*",
+                     jobs: int = 1) -> List[str]:
+        """Convert multiple files in a directory, optionally in parallel."""
         input_dir = Path(input_dir)
-        
+
         if not input_dir.exists():
             raise FileNotFoundError(f"Input directory not found: {input_dir}")
-        
+
         if not output_dir:
             output_dir = input_dir / "markdown_output"
         else:
             output_dir = Path(output_dir)
-        
+
         output_dir.mkdir(parents=True, exist_ok=True)
-        
+
         # Find all matching files
         files = list(input_dir.glob(pattern))
         supported_extensions = {'.doc', '.docx', '.html', '.htm', '.txt', '.rtf'}
-        
+
         converted_files = []
-        
+        tasks = []
+
         for file_path in files:
             if file_path.suffix.lower() in supported_extensions or self.detect_file_type(file_path) in ['mhtml', 'html']:
+                tasks.append((file_path, output_dir / (file_path.stem + '.md')))
+
+        if jobs > 1 and len(tasks) > 1:
+            # Conversions are independent and CPU-bound, so fan out across
+            # processes (not threads) to bypass the GIL
+            with ProcessPoolExecutor(max_workers=jobs) as executor:
+                futures = {
+                    executor.submit(_convert_one, str(fp), str(op), self.config): fp
+                    for fp, op in tasks
+                }
+                for future in as_completed(futures):
+                    try:
+                        converted_files.append(future.result())
+                    except Exception as e:
+                        logger.error(f"Failed to convert {futures[future]}: {e}")
+        else:
+            for file_path, output_path in tasks:
                 try:
-                    output_path = output_dir / (file_path.stem + '.md')
                     result = self.convert_file(file_path, output_path)
                     converted_files.append(result)
                 except Exception as e:
                     logger.error(f"Failed to convert {file_path}: {e}")
-        
+
         logger.info(f"Batch conversion complete. Converted {len(converted_files)} files.")
         return converted_files
 
 
+def _convert_one(input_path: str, output_path: str, config: Dict) -> str:
+    """Convert a single file in a worker process.
+
+    Module-level so it can be pickled by ProcessPoolExecutor; each worker
+    builds its own converter from the plain config dict.
+    """
+    converter = DocToMarkdownConverter(config)
+    return converter.convert_file(input_path, output_path)
+
+
 def create_requirements_txt():
     """Create requirements.txt file for the dependencies."""
     requirements = """beautifulsoup4>=4.12.0
@@ -607,6 +681,8 @@ Examples:
     parser.add_argument('-d', '--directory', help='Input directory for batch conversion')
     parser.add_argument('-od', '--output-directory', help='Output directory for batch conversion')
     parser.add_argument('--pattern', default='*.*', help='File pattern for batch conversion')
+    parser.add_argument('-j', '--jobs', type=int, default=os.cpu_count() or 1,
+                        help='Worker processes for batch conversion (default: CPU count)')
     parser.add_argument('--no-metadata', action='store_true', help='Skip metadata header')
     parser.add_argument('--ignore-links', action='store_true', help='Ignore links in conversion')
     parser.add_argument('--ignore-images', action='store_true', help='Ignore images in conversion')
@@ -635,9 +711,10 @@ Examples:
         if args.directory:
             # Batch conversion
             converted = converter.batch_convert(
-                args.directory, 
-                args.output_directory, 
-                args.pattern
+                args.directory,
+                args.output_directory,
+                args.pattern,
+                jobs=args.jobs
             )
             print(f"Converted {len(converted)} files:")
             for file_path in converted:
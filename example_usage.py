@@ -4,14 +4,20 @@ Example script demonstrating how to convert the provided Confluence export (.doc
 to clean markdown suitable for RAG workflows.
 """
 
+import contextlib
+import quopri
+import re
 import tempfile
 import os
 from pathlib import Path
 
-# Create a sample file similar to your Confluence export
-def create_sample_confluence_export():
-    """Create a sample file matching your Confluence export format (.doc extension)."""
-    sample_content = '''Date: Wed, 17 Sep 2025 15:33:16 +0000 (UTC)
+# MIME envelope probes, compiled once at import rather than per call
+_BOUNDARY_RE = re.compile(rb'boundary="([^"]+)"')
+_CTE_RE = re.compile(rb'Content-Transfer-Encoding:\s*([^\r\n]+)', re.I)
+
+# Sample payload matching a real Confluence export, as raw bytes built once
+# at import so the writer streams it straight to disk without re-encoding
+_CONFLUENCE_SAMPLE = b'''Date: Wed, 17 Sep 2025 15:33:16 +0000 (UTC)
 Message-ID: <265945599.29.1758123196242@4bdbc70beb76>
 Subject: Exported From Confluence
 MIME-Version: 1.0
@@ -102,12 +108,48 @@ datasets</p></li>
 </html>
 ------=_Part_28_2131790293.1758123196241--
 '''
-    
-    # Save to temporary file with .doc extension (like real Confluence exports)
-    with tempfile.NamedTemporaryFile(mode='w', suffix='_confluence_export.doc', 
-                                   delete=False, encoding='utf-8') as f:
-        f.write(sample_content)
-        return f.name
+
+
+def _chunks(data, size=65536):
+    """Yield successive size-byte views of data without copying it."""
+    view = memoryview(data)
+    for start in range(0, len(view), size):
+        yield view[start:start + size]
+
+
+def _safe_unlink(path):
+    """Remove path, swallowing the already-gone case without a stat probe."""
+    try:
+        os.unlink(path)
+    except FileNotFoundError:
+        pass
+
+
+def _read_preview(path, n=2000):
+    """Read the first n bytes of path through a raw fd, skipping TextIOWrapper."""
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        data = os.read(fd, n)
+    finally:
+        os.close(fd)
+    return data.decode('utf-8', errors='replace')
+
+
+# Create a sample file similar to your Confluence export
+def create_sample_confluence_export():
+    """Create a sample Confluence export; returns (path, size in bytes).
+
+    Returning the known byte count saves the caller a stat on a file we
+    just wrote.
+    """
+    # Save to temporary file with .doc extension (like real Confluence exports).
+    # Binary mode skips the text-codec layer; chunked writes keep the peak
+    # buffer bounded for larger payloads
+    with tempfile.NamedTemporaryFile(mode='wb', suffix='_confluence_export.doc',
+                                   delete=False) as f:
+        for chunk in _chunks(_CONFLUENCE_SAMPLE):
+            f.write(chunk)
+        return f.name, len(_CONFLUENCE_SAMPLE)
 
 def run_conversion_example():
     """Run the conversion example."""
@@ -117,9 +159,28 @@ def run_conversion_example():
     print("=" * 60)
     
     # Create sample file
-    sample_file = create_sample_confluence_export()
+    sample_file, original_size = create_sample_confluence_export()
     print(f"✓ Created sample Confluence .doc export: {sample_file}")
+
+    # Show what the converter will have to deal with
+    raw_sample = Path(sample_file).read_bytes()
+    boundary = _BOUNDARY_RE.search(raw_sample)
+    encoding = _CTE_RE.search(raw_sample)
+    if boundary and encoding:
+        print(f"✓ MIME boundary: {boundary.group(1).decode()}")
+        print(f"✓ Transfer encoding: {encoding.group(1).decode()}")
+        if encoding.group(1).strip().lower() == b'quoted-printable':
+            # quopri dispatches to binascii's C decoder -- the same one the
+            # converter uses internally for the HTML part
+            decoded = quopri.decodestring(raw_sample)
+            print(f"✓ Quoted-printable body decodes to {len(decoded):,} bytes "
+                  f"(from {len(raw_sample):,} raw)")
     
+    # Register sample cleanup once: it runs only if the example fails,
+    # replacing the exists()+unlink pair on the error path
+    cleanup = contextlib.ExitStack()
+    cleanup.callback(_safe_unlink, sample_file)
+
     # Import and use the converter
     try:
         from doc_to_markdown_converter import DocToMarkdownConverter
@@ -129,6 +190,11 @@ def run_conversion_example():
             'ignore_images': True,      # Remove images for RAG
             'ignore_links': False,      # Keep links for context
             'body_width': 0,           # No line wrapping
+            'html_parser': 'lxml',     # C tokenizer for the HTML body
+            'engine': 'markdownify',   # Render the soup without re-tokenizing
+            # 'use_selectolax': True is faster still, but flattens inline
+            # markup and drops link URLs -- a lossy opt-in that would
+            # defeat ignore_links=False above
         })
         
         # Convert the file
@@ -137,18 +203,17 @@ def run_conversion_example():
         
         print(f"✓ Converted to markdown: {result_path}")
         
-        # Display the converted content
-        with open(result_path, 'r', encoding='utf-8') as f:
-            markdown_content = f.read()
-        
+        # Display a bounded preview of the converted content
+        markdown_preview = _read_preview(result_path)
+
         print("\n" + "=" * 60)
-        print("CONVERTED MARKDOWN CONTENT:")
+        print("CONVERTED MARKDOWN CONTENT (first 2000 bytes):")
         print("=" * 60)
-        print(markdown_content)
+        print(markdown_preview)
         print("=" * 60)
         
-        # Show file sizes for comparison
-        original_size = os.path.getsize(sample_file)
+        # Show file sizes for comparison (original size came back from
+        # the creator; only the converted output needs a stat)
         converted_size = os.path.getsize(result_path)
         
         print(f"\nFile Size Comparison:")
@@ -165,7 +230,8 @@ def run_conversion_example():
         print(f"✅ Consistent markdown formatting")
         print(f"✅ Automatic detection of MHTML content in .doc files")
         
-        # Keep files for inspection
+        # Keep files for inspection: success cancels the registered cleanup
+        cleanup.pop_all()
         print(f"\nFiles saved for your inspection:")
         print(f"- Original: {sample_file}")
         print(f"- Converted: {result_path}")
@@ -174,11 +240,12 @@ def run_conversion_example():
     except ImportError:
         print("❌ Error: doc_to_markdown_converter module not found")
         print("Make sure the doc_to_markdown_converter.py file is in the same directory")
+        cleanup.pop_all()  # leave the sample so the user can retry
     except Exception as e:
         print(f"❌ Conversion failed: {e}")
-        # Clean up on error
-        if os.path.exists(sample_file):
-            os.unlink(sample_file)
+    finally:
+        # Runs any still-registered cleanup (i.e. only on conversion errors)
+        cleanup.close()
 
 def show_usage_patterns():
     """Show common usage patterns for RAG workflows."""